@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from solver import ENGINES, format_puzzle, parse_puzzle
+
+
+SolveResult = namedtuple('SolveResult', 'index puzzle solution status elapsed stats')
+
+
+def solve_many(puzzles, engine='dlx'):
+    '''Solves puzzles one at a time and yields a SolveResult for each.
+
+    puzzles may hold lines in the one-puzzle-per-line format or 9x9 grids.
+    Blank lines and lines starting with '#' are skipped; index is the
+    position in the input, so results can be matched back to their lines.
+    '''
+    solve = ENGINES[engine]
+
+    for index, puzzle in enumerate(puzzles):
+        result = _solve_one(solve, index, puzzle)
+        if result is not None:
+            yield result
+
+
+def _solve_one(solve, index, puzzle):
+    if isinstance(puzzle, str):
+        line = puzzle.strip()
+        if not line or line.startswith('#'):
+            return None
+        try:
+            puzzle = parse_puzzle(line)
+        except ValueError:
+            return SolveResult(index, line, None, 'invalid', 0.0, {})
+
+    stats = {}
+    start = time.perf_counter()
+    solution = solve(puzzle, stats)
+    elapsed = time.perf_counter() - start
+
+    return SolveResult(
+        index,
+        format_puzzle(puzzle),
+        format_puzzle(solution) if solution is not None else None,
+        'solved' if solution is not None else 'unsolvable',
+        elapsed,
+        stats,
+    )
+
+
+def _solve_chunk(engine, chunk):
+    '''Worker entry point.  chunk holds (index, line) pairs in the one-line
+    format, which pickles far smaller than Sudoku/Cell objects would.'''
+    solve = ENGINES[engine]
+    results = []
+    for index, line in chunk:
+        result = _solve_one(solve, index, line)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def _chunks(puzzles, chunk_size):
+    chunk = []
+    for index, puzzle in enumerate(puzzles):
+        if not isinstance(puzzle, str):
+            puzzle = format_puzzle(puzzle)
+        chunk.append((index, puzzle))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_parallel(puzzles, engine='dlx', workers=None, chunk_size=256, ordered=True):
+    '''Like solve_many, but spreads chunks of puzzles over a process pool.
+
+    At most two chunks per worker are in flight, so memory stays bounded for
+    any input size.  With ordered=False results are yielded as soon as their
+    chunk finishes instead of in input order.
+    '''
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque() if ordered else set()
+
+        def drain(block_until):
+            if ordered:
+                while len(pending) > block_until:
+                    yield from pending.popleft().result()
+            else:
+                while len(pending) > block_until:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+                        yield from future.result()
+
+        for chunk in _chunks(puzzles, chunk_size):
+            future = executor.submit(_solve_chunk, engine, chunk)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+            yield from drain(max_pending - 1)
+
+        yield from drain(0)
+
+
+def write_results(results, output):
+    '''Writes one tab-separated line per result and returns (total, solved,
+    seconds spent solving).  Each line holds the input index, the puzzle,
+    the solution ('-' if there is none), the status and the milliseconds
+    taken, so results can be joined to their input lines in any order.'''
+    total = solved = 0
+    elapsed = 0.0
+    for result in results:
+        total += 1
+        elapsed += result.elapsed
+        if result.status == 'solved':
+            solved += 1
+        output.write(
+            f'{result.index}\t{result.puzzle}\t{result.solution or "-"}\t'
+            f'{result.status}\t{result.elapsed * 1000:.3f}\n'
+        )
+    return total, solved, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Solve puzzles in the one-per-line format (81 characters, 0 or . for blanks).'
+    )
+    parser.add_argument('input', nargs='?', default='-', help="puzzle file, or '-' for stdin")
+    parser.add_argument('-e', '--engine', default='dlx', choices=sorted(ENGINES))
+    parser.add_argument('-o', '--output', default='-', help="output file, or '-' for stdout")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='worker processes; 0 uses every core')
+    parser.add_argument('--chunk-size', type=int, default=256,
+                        help='puzzles sent to a worker at a time')
+    parser.add_argument('--unordered', action='store_true',
+                        help='write results as they finish rather than in input order')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='propagate whole chunks at once with NumPy, then finish '
+                             'leftover boards with the chosen engine (single process)')
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 (every core) or more')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.vectorized and (args.jobs != 1 or args.unordered):
+        parser.error('--vectorized runs in a single process; it cannot be combined with --jobs or --unordered')
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+
+    start = time.perf_counter()
+    try:
+        if args.vectorized:
+            from vectorized import solve_many_vectorized
+            results = solve_many_vectorized(source, args.engine, args.chunk_size)
+        elif args.jobs == 1:
+            results = solve_many(source, args.engine)
+        else:
+            results = solve_parallel(
+                source,
+                args.engine,
+                workers=args.jobs or None,
+                chunk_size=args.chunk_size,
+                ordered=not args.unordered,
+            )
+        total, solved, elapsed = write_results(results, output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    wall = time.perf_counter() - start
+
+    rate = total / wall if wall else 0.0
+    print(
+        f'{solved}/{total} solved in {wall:.3f} s '
+        f'({elapsed:.3f} s solving, {rate:.1f} puzzles/s)',
+        file=sys.stderr,
+    )
+    return 0 if solved == total else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+'''Headless benchmark of the solving engines over fixed, seeded puzzle sets.
+
+    python benchmark.py --count 5 --json results.json
+
+Every engine from solver.ENGINES runs on the same easy, medium, hard and
+extreme puzzles.  Wall time, CPU time and nodes expanded come from one run;
+peak memory comes from a second run under tracemalloc, because tracing slows
+the search down too much to time it at the same time.
+'''
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from generator import generate_puzzles
+from solver import ENGINES, SearchLimit, Sudoku, check_sudoku, parse_puzzle, prepare_dlx
+
+
+LEVELS = ('easy', 'medium', 'hard', 'extreme')
+
+# Well-known hard puzzles with a single solution each.
+EXTREME = (
+    '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..',
+    '1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..',
+    '.......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...',
+    '..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9',
+    '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+    '52...6.........7.13...........4..8..6......5...........418.........3..2...87.....',
+    '6.....8.3.4.7.................5.4.7.3..2.....1.6.......2.....5.....8.6......1....',
+    '48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....',
+)
+
+
+def puzzle_set(level, count, seed=0):
+    '''Returns count puzzles for a level; the same seed gives the same set.'''
+    if level == 'extreme':
+        return [parse_puzzle(EXTREME[i % len(EXTREME)]) for i in range(count)]
+    return [generated.puzzle for generated in generate_puzzles(count, level=level, seed=f'{seed}-{level}')]
+
+
+def keeps_givens(puzzle, solution):
+    '''True if solution has every non-zero cell of puzzle unchanged.'''
+    return all(
+        given == value
+        for puzzle_row, solution_row in zip(puzzle, solution)
+        for given, value in zip(puzzle_row, solution_row)
+        if given
+    )
+
+
+def run_one(engine, puzzle, max_nodes=None, measure_memory=True):
+    '''Solves one puzzle and returns a dict of measurements.'''
+    solve = ENGINES[engine]
+    stats = {}
+
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        solution = solve(puzzle, stats, max_nodes=max_nodes)
+        status = 'solved' if solution is not None else 'unsolvable'
+    except SearchLimit:
+        solution = None
+        status = 'limit'
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+
+    if solution is not None and not (check_sudoku(Sudoku(solution)) and keeps_givens(puzzle, solution)):
+        status = 'wrong'
+
+    peak = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            solve(puzzle, {}, max_nodes=max_nodes)
+        except SearchLimit:
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'status': status,
+        'wall': wall,
+        'cpu': cpu,
+        'nodes': stats.get('nodes', 0),
+        'peak_bytes': peak,
+        'stats': stats,
+    }
+
+
+def summarize(engine, level, runs):
+    solved = [run for run in runs if run['status'] == 'solved']
+    peaks = [run['peak_bytes'] for run in runs if run['peak_bytes'] is not None]
+    return {
+        'engine': engine,
+        'level': level,
+        'puzzles': len(runs),
+        'success_rate': len(solved) / len(runs) if runs else 0.0,
+        'wall_mean': statistics.mean(run['wall'] for run in runs),
+        'wall_median': statistics.median(run['wall'] for run in runs),
+        'cpu_mean': statistics.mean(run['cpu'] for run in runs),
+        'nodes_mean': statistics.mean(run['nodes'] for run in runs),
+        'peak_bytes_max': max(peaks) if peaks else None,
+        'runs': runs,
+    }
+
+
+def run_benchmark(engines=None, levels=LEVELS, count=5, seed=0, max_nodes=20000,
+                  measure_memory=True, progress=None):
+    '''Runs every engine on every level and returns a list of summaries.'''
+    if count < 1:
+        raise ValueError('The benchmark needs at least one puzzle per level.')
+    engines = engines or list(ENGINES)
+    # Build the shared DLX matrix up front so the first dlx run is not
+    # charged for it.
+    prepare_dlx()
+    results = []
+    for level in levels:
+        puzzles = puzzle_set(level, count, seed)
+        for engine in engines:
+            runs = [run_one(engine, puzzle, max_nodes, measure_memory) for puzzle in puzzles]
+            results.append(summarize(engine, level, runs))
+            if progress is not None:
+                progress(results[-1])
+    return results
+
+
+def format_table(results):
+    header = f"{'engine':<10}{'level':<9}{'ok':>6}{'wall ms':>11}{'cpu ms':>11}{'nodes':>11}{'peak KiB':>11}"
+    lines = [header, '-' * len(header)]
+    for result in results:
+        peak = result['peak_bytes_max']
+        lines.append(
+            f"{result['engine']:<10}{result['level']:<9}"
+            f"{result['success_rate'] * 100:>5.0f}%"
+            f"{result['wall_mean'] * 1000:>11.2f}"
+            f"{result['cpu_mean'] * 1000:>11.2f}"
+            f"{result['nodes_mean']:>11.0f}"
+            f"{peak / 1024 if peak is not None else float('nan'):>11.1f}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Sudoku solving engines.')
+    parser.add_argument('-e', '--engine', action='append', choices=sorted(ENGINES),
+                        help='engine to run (repeatable); default is all')
+    parser.add_argument('-l', '--level', action='append', choices=LEVELS,
+                        help='puzzle level to run (repeatable); default is all')
+    parser.add_argument('-n', '--count', type=int, default=5, help='puzzles per level')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-nodes', type=int, default=20000,
+                        help='node budget per solve; runs over it count as failures')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--json', help='write full results to this file')
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error('--count must be at least 1')
+
+    def progress(result):
+        print(f"{result['engine']:>10} {result['level']:<8} done", file=sys.stderr)
+
+    results = run_benchmark(
+        engines=args.engine,
+        levels=args.level or LEVELS,
+        count=args.count,
+        seed=args.seed,
+        max_nodes=args.max_nodes,
+        measure_memory=not args.no_memory,
+        progress=progress,
+    )
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+'''Generates large corpora of unique, graded puzzles on every core.
+
+    python farm.py 1000000 -o corpus -j 0 --level hard
+
+Each worker generates a seeded chunk of puzzles (digging already proves
+every puzzle unique) and rates them.  The parent drops duplicates and
+writes the rest to sharded files per difficulty band, one line per puzzle:
+
+    <puzzle>\t<solution>\t<clues>\t<rating>
+
+Chunks are independent, so throughput grows with the number of workers.
+'''
+import argparse
+import hashlib
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import count
+
+from frontier import make_visited
+from generator import LEVEL_CLUES, difficulty_band, generate_puzzles
+from solver import format_puzzle
+
+
+FarmRecord = namedtuple('FarmRecord', 'puzzle solution clues rating band')
+
+
+def _generate_chunk(seed, size, options):
+    '''Worker entry point: returns size records generated from seed.'''
+    return [
+        FarmRecord(
+            format_puzzle(generated.puzzle),
+            format_puzzle(generated.solution),
+            generated.clues,
+            generated.rating,
+            difficulty_band(generated.clues, generated.rating),
+        )
+        for generated in generate_puzzles(size, seed=seed, **options)
+    ]
+
+
+def _puzzle_key(line):
+    # A uniform 64-bit key, which the Bloom backend relies on.
+    return int.from_bytes(hashlib.blake2b(line.encode(), digest_size=8).digest(), 'little')
+
+
+def farm(total, workers=None, chunk_size=64, seed=0, dedup='exact', stats=None, progress=None, **options):
+    '''Yields total unique FarmRecords generated across a process pool.
+
+    options go to generator.generate_puzzles (level, target_clues,
+    target_rating, symmetric).  Chunk i is generated from the seed
+    f'{seed}-{i}', so the same seed produces the same puzzles, although
+    chunks finish, and are yielded, in no fixed order.  dedup is 'exact' or
+    'bloom' (bounded memory; a false positive drops a new puzzle).  Counts
+    of generated, duplicate and written puzzles and of puzzles per band go
+    in stats; progress, if given, is called with stats after every chunk.
+    '''
+    if dedup == 'exact':
+        seen = make_visited('exact')
+    elif dedup == 'bloom':
+        seen = make_visited('bloom', capacity=max(total, 1))
+    else:
+        raise ValueError(f'Unknown dedup backend {dedup!r}.')
+    workers = workers or os.cpu_count() or 1
+    if stats is None:
+        stats = {}
+    stats.update(generated=0, duplicates=0, written=0, bands={}, start=time.perf_counter())
+    chunks = count()
+
+    def accept(records):
+        for record in records:
+            if stats['written'] >= total:
+                return
+            stats['generated'] += 1
+            key = _puzzle_key(record.puzzle)
+            if key in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(key)
+            stats['written'] += 1
+            stats['bands'][record.band] = stats['bands'].get(record.band, 0) + 1
+            yield record
+
+    def finish(records):
+        yield from accept(records)
+        if progress is not None:
+            progress(stats)
+
+    if workers == 1:
+        while stats['written'] < total:
+            yield from finish(_generate_chunk(f'{seed}-{next(chunks)}', chunk_size, options))
+        return
+
+    executor = ProcessPoolExecutor(workers)
+    try:
+        pending = set()
+        while stats['written'] < total:
+            while len(pending) < workers * 2:
+                pending.add(executor.submit(_generate_chunk, f'{seed}-{next(chunks)}', chunk_size, options))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from finish(future.result())
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+class ShardWriter:
+    '''Writes FarmRecords to one series of files per difficulty band, named
+    <band>-00000.txt, <band>-00001.txt, ..., with shard_size lines each.'''
+
+    def __init__(self, directory, shard_size=100000):
+        if shard_size < 1:
+            raise ValueError('shard_size must be at least 1.')
+        self.directory = directory
+        self.shard_size = shard_size
+        self._files = {}
+        self._lines = {}
+        self._shards = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, record):
+        band = record.band
+        output = self._files.get(band)
+        if output is None or self._lines[band] >= self.shard_size:
+            output = self._open(band)
+        output.write(f'{record.puzzle}\t{record.solution}\t{record.clues}\t{record.rating}\n')
+        self._lines[band] += 1
+
+    def _open(self, band):
+        if band in self._files:
+            self._files[band].close()
+        shard = self._shards.get(band, -1) + 1
+        self._shards[band] = shard
+        self._lines[band] = 0
+        output = open(os.path.join(self.directory, f'{band}-{shard:05d}.txt'), 'w')
+        self._files[band] = output
+        return output
+
+    def close(self):
+        for output in self._files.values():
+            output.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def format_progress(stats):
+    elapsed = time.perf_counter() - stats['start']
+    rate = stats['written'] / elapsed if elapsed else 0.0
+    bands = ' '.join(f'{band} {number}' for band, number in sorted(stats['bands'].items()))
+    return (
+        f"{stats['written']} puzzles ({stats['duplicates']} duplicates) "
+        f"in {elapsed:.1f} s, {rate:.1f} puzzles/s  {bands}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a graded corpus of unique puzzles.')
+    parser.add_argument('count', type=int, help='number of unique puzzles to write')
+    parser.add_argument('-o', '--output', default='corpus', help='directory for the shard files')
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='worker processes; 0 uses every core')
+    parser.add_argument('--chunk-size', type=int, default=64, help='puzzles per worker task')
+    parser.add_argument('--shard-size', type=int, default=100000, help='lines per output file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--level', choices=sorted(LEVEL_CLUES), help='dig to this level\'s clue count')
+    parser.add_argument('--target-clues', type=int, help='dig to this many clues (overrides --level)')
+    parser.add_argument('--target-rating', type=int, help='stop digging at this rating')
+    parser.add_argument('--symmetric', action='store_true', help='dig in 180-degree symmetric pairs')
+    parser.add_argument('--dedup', default='exact', choices=('exact', 'bloom'),
+                        help='exact keeps every key; bloom bounds memory but may drop a few puzzles')
+    parser.add_argument('--progress-every', type=float, default=5.0,
+                        help='seconds between progress lines on stderr')
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error('--jobs must be 0 (every core) or more')
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+
+    last = [0.0]
+
+    def progress(stats):
+        now = time.perf_counter()
+        if now - last[0] >= args.progress_every:
+            last[0] = now
+            print(format_progress(stats), file=sys.stderr)
+
+    stats = {}
+    records = farm(
+        args.count,
+        workers=args.jobs or None,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        dedup=args.dedup,
+        stats=stats,
+        progress=progress,
+        level=args.level,
+        target_clues=args.target_clues,
+        target_rating=args.target_rating,
+        symmetric=args.symmetric,
+    )
+    with ShardWriter(args.output, args.shard_size) as writer:
+        for record in records:
+            writer.write(record)
+
+    print(format_progress(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
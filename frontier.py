@@ -0,0 +1,309 @@
+'''Pluggable visited-set and queue backends for the frontier searches in
+solver.py.
+
+Every backend stores 64-bit Zobrist keys and supports `key in visited`,
+`visited.add(key)`, `len(visited)`, memory() for its approximate size in
+bytes and report() for a summary including the hit rate of its lookups.
+
+    exact  -- a plain set; never forgets and never lies (the default)
+    lru    -- keeps only the most recently used `capacity` keys
+    bloom  -- fixed-size Bloom filter; may report unseen keys as seen with
+              probability close to `error_rate` once `capacity` keys are in
+
+The lru and bloom backends bound memory at the cost of completeness: lru can
+let a duplicate state be expanded again, and a Bloom false positive prunes a
+state that was never seen, so a search may miss a solution.
+
+SpillQueue is a FIFO of fixed-size states for solve_bfs that keeps a hot
+segment in memory and spills the rest to memory-mapped segment files.
+'''
+import math
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict, deque
+
+
+_INT_BYTES = sys.getsizeof(1 << 63)
+
+
+class ExactVisited:
+
+    kind = 'exact'
+
+    def __init__(self):
+        self._keys = set()
+        self.lookups = 0
+        self.hits = 0
+
+    def __contains__(self, key):
+        self.lookups += 1
+        if key in self._keys:
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, key):
+        self._keys.add(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def memory(self):
+        return sys.getsizeof(self._keys) + len(self._keys) * _INT_BYTES
+
+    def report(self):
+        return {
+            'kind': self.kind,
+            'size': len(self),
+            'memory': self.memory(),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+        }
+
+
+class LRUVisited(ExactVisited):
+
+    kind = 'lru'
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError('LRU capacity must be at least 1.')
+        super().__init__()
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self.evictions = 0
+
+    def __contains__(self, key):
+        self.lookups += 1
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            self.hits += 1
+            return True
+        return False
+
+    def add(self, key):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.capacity:
+            self._keys.popitem(last=False)
+            self.evictions += 1
+
+    def report(self):
+        report = super().report()
+        report['capacity'] = self.capacity
+        report['evictions'] = self.evictions
+        return report
+
+
+class BloomVisited(ExactVisited):
+
+    kind = 'bloom'
+
+    def __init__(self, capacity, error_rate=0.001):
+        if capacity < 1:
+            raise ValueError('Bloom capacity must be at least 1.')
+        if not 0 < error_rate < 1:
+            raise ValueError('Bloom error rate must be between 0 and 1.')
+        super().__init__()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._filter = bytearray((self.bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, key):
+        # Zobrist keys are uniformly random, so their two 32-bit halves serve
+        # as independent hashes for double hashing.
+        low = key & 0xFFFFFFFF
+        high = (key >> 32) | 1
+        return [(low + i * high) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        self.lookups += 1
+        bloom = self._filter
+        for position in self._positions(key):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        self.hits += 1
+        return True
+
+    def add(self, key):
+        bloom = self._filter
+        for position in self._positions(key):
+            bloom[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def memory(self):
+        return sys.getsizeof(self._filter)
+
+    def report(self):
+        report = super().report()
+        report['capacity'] = self.capacity
+        report['error_rate'] = self.error_rate
+        report['bits'] = self.bits
+        report['hashes'] = self.hashes
+        return report
+
+
+VISITED_BACKENDS = {
+    'exact': ExactVisited,
+    'lru': LRUVisited,
+    'bloom': BloomVisited,
+}
+
+
+def make_visited(kind='exact', **options):
+    '''Builds a visited-set backend by name, e.g. make_visited('lru',
+    capacity=100000) or make_visited('bloom', capacity=10**6, error_rate=1e-4).'''
+    try:
+        backend = VISITED_BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f'Unknown visited-set backend {kind!r}.') from None
+    return backend(**options)
+
+
+class SpillQueue:
+    '''FIFO queue of fixed-size byte states that spills to disk.
+
+    Up to hot_limit states live in memory at the front of the queue.  Past
+    that, new states collect in a write buffer that is flushed every
+    segment_states states to an append-only segment file; segments are read
+    back through mmap, oldest first, once the hot states run out.  Use it as
+    a context manager (or call close()) to remove the segment files.
+    '''
+
+    def __init__(self, hot_limit=100000, state_size=81, segment_states=65536, directory=None):
+        if hot_limit < 1 or segment_states < 1:
+            raise ValueError('hot_limit and segment_states must be at least 1.')
+        self.hot_limit = hot_limit
+        self.state_size = state_size
+        self.segment_states = segment_states
+        self._owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix='sudoku-frontier-') if directory is None else directory
+
+        self._head = deque()
+        self._segments = deque()
+        self._tail = []
+        self._reader = None
+        self._reader_file = None
+        self._reader_path = None
+        self._reader_offset = 0
+        self._reader_end = 0
+        self._next_segment = 0
+        self._spilled = 0
+        self._length = 0
+
+        self.segments_written = 0
+        self.states_spilled = 0
+
+    def append(self, state):
+        if len(state) != self.state_size:
+            raise ValueError(f'States must be {self.state_size} bytes long.')
+        if self._spilled or self._tail or self._reader is not None or len(self._head) >= self.hot_limit:
+            self._tail.append(state)
+            if len(self._tail) >= self.segment_states:
+                self._flush()
+        else:
+            self._head.append(state)
+        self._length += 1
+
+    def popleft(self):
+        if not self._head and not self._fill_head():
+            raise IndexError('pop from an empty SpillQueue')
+        self._length -= 1
+        return self._head.popleft()
+
+    def __len__(self):
+        return self._length
+
+    def __bool__(self):
+        return self._length > 0
+
+    def memory(self):
+        '''Approximate bytes held in memory (disk segments not included).'''
+        state_bytes = sys.getsizeof(bytes(self.state_size)) + 8
+        return (len(self._head) + len(self._tail)) * state_bytes
+
+    def report(self):
+        return {
+            'length': self._length,
+            'in_memory': len(self._head) + len(self._tail),
+            'on_disk': self._spilled,
+            'segments_written': self.segments_written,
+            'states_spilled': self.states_spilled,
+            'memory': self.memory(),
+        }
+
+    def _flush(self):
+        path = os.path.join(self.directory, f'segment-{self._next_segment:08d}.bin')
+        self._next_segment += 1
+        with open(path, 'wb') as segment:
+            segment.write(b''.join(self._tail))
+        self._segments.append((path, len(self._tail)))
+        self._spilled += len(self._tail)
+        self.states_spilled += len(self._tail)
+        self.segments_written += 1
+        self._tail = []
+
+    def _fill_head(self):
+        '''Moves up to hot_limit of the oldest spilled or buffered states into
+        the in-memory head.  Returns False if the queue is empty.'''
+        size = self.state_size
+        while len(self._head) < self.hot_limit:
+            if self._reader is None:
+                if not self._segments:
+                    break
+                self._open_segment()
+            if self._reader_offset >= self._reader_end:
+                self._close_segment()
+                continue
+            self._head.append(self._reader[self._reader_offset:self._reader_offset + size])
+            self._reader_offset += size
+            self._spilled -= 1
+
+        if not self._head and self._tail:
+            self._head.extend(self._tail)
+            self._tail = []
+        return bool(self._head)
+
+    def _open_segment(self):
+        path, states = self._segments.popleft()
+        self._reader_path = path
+        self._reader_file = open(path, 'rb')
+        self._reader = mmap.mmap(self._reader_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._reader_offset = 0
+        self._reader_end = states * self.state_size
+
+    def _close_segment(self):
+        self._reader.close()
+        self._reader_file.close()
+        os.remove(self._reader_path)
+        self._reader = None
+        self._reader_file = None
+        self._reader_path = None
+
+    def close(self):
+        if self._reader is not None:
+            self._close_segment()
+        for path, _ in self._segments:
+            os.remove(path)
+        self._segments.clear()
+        self._head.clear()
+        self._tail = []
+        self._spilled = self._length = 0
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
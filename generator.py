@@ -0,0 +1,189 @@
+import random
+from collections import namedtuple
+
+from solver import has_solution_excluding, propagate_solve
+
+
+GeneratedPuzzle = namedtuple('GeneratedPuzzle', 'puzzle solution clues rating')
+
+# Clue counts generate_puzzle digs down to for each level.  Digging stops
+# earlier, with more clues, once no cell can go without losing uniqueness.
+LEVEL_CLUES = {
+    'easy': 40,
+    'medium': 32,
+    'hard': 26,
+    'extreme': 17,
+}
+
+
+def is_valid(board, row, col, num):
+    for i in range(9):
+        if board[row][i] == num or board[i][col] == num:
+            return False
+    box_x = col // 3 * 3
+    box_y = row // 3 * 3
+    for i in range(3):
+        for j in range(3):
+            if board[box_y + i][box_x + j] == num:
+                return False
+    return True
+
+
+# solved_grid samples from the equivalence classes of these grids: the base
+# pattern plus a few grids found once by the backtracker, built on first use
+# from a fixed seed so generation stays reproducible.
+BASE_GRID = [[(3 * (row % 3) + row // 3 + col) % 9 + 1 for col in range(9)] for row in range(9)]
+SEED_GRID_COUNT = 32
+_SEED_GRIDS = None
+
+
+def solve_board(board, rng=random):
+    for row in range(9):
+        for col in range(9):
+            if board[row][col] == 0:
+                nums = list(range(1, 10))
+                rng.shuffle(nums)
+                for num in nums:
+                    if is_valid(board, row, col, num):
+                        board[row][col] = num
+                        if solve_board(board, rng):
+                            return True
+                        board[row][col] = 0
+                return False
+    return True
+
+
+def seed_grids():
+    '''Returns the seed grids, building them on the first call.'''
+    global _SEED_GRIDS
+    if _SEED_GRIDS is None:
+        rng = random.Random(0)
+        grids = [BASE_GRID]
+        for _ in range(SEED_GRID_COUNT - 1):
+            grid = [[0 for _ in range(9)] for _ in range(9)]
+            solve_board(grid, rng)
+            grids.append(grid)
+        _SEED_GRIDS = grids
+    return _SEED_GRIDS
+
+
+def _shuffled_lines(rng):
+    '''Row (or column) order with the bands shuffled and the lines shuffled
+    within each band, which keeps every box intact.'''
+    bands = [0, 1, 2]
+    rng.shuffle(bands)
+    order = []
+    for band in bands:
+        lines = [band * 3, band * 3 + 1, band * 3 + 2]
+        rng.shuffle(lines)
+        order.extend(lines)
+    return order
+
+
+def solved_grid(rng=random, seeds=None):
+    '''Samples a solved 9x9 grid by applying validity-preserving symmetries
+    to one of the seed grids: digit relabeling, row and column swaps within
+    bands and stacks, band and stack swaps, and transposition.  Takes
+    microseconds where solve_board backtracks.'''
+    grid = rng.choice(seeds or seed_grids())
+    digits = list(range(1, 10))
+    rng.shuffle(digits)
+    relabel = [0] + digits
+    rows = _shuffled_lines(rng)
+    cols = _shuffled_lines(rng)
+    if rng.random() < 0.5:
+        return [[relabel[grid[row][col]] for col in cols] for row in rows]
+    return [[relabel[grid[row][col]] for row in rows] for col in cols]
+
+
+def generate_board(level='easy'):
+    '''Returns a 9x9 puzzle with a unique solution for level (easy if the
+    level is unknown).  Use generate_puzzles for reproducible batches.'''
+    if level not in LEVEL_CLUES:
+        level = 'easy'
+    return generate_puzzle(level, rng=random).puzzle
+
+
+def rate_puzzle(puzzle):
+    '''Rates a puzzle by the guesses the propagation solver needs; 0 means
+    singles and pointing pairs solve it without guessing.'''
+    stats = {}
+    propagate_solve(puzzle, stats)
+    return stats['guesses']
+
+
+def difficulty_band(clues, rating):
+    '''Sorts a puzzle into easy, medium, hard or extreme.'''
+    if rating == 0:
+        return 'easy' if clues >= 36 else 'medium'
+    return 'hard' if rating <= 8 else 'extreme'
+
+
+def _dig_order(rng, symmetric):
+    cells = list(range(81))
+    rng.shuffle(cells)
+    if not symmetric:
+        return [(index,) for index in cells]
+    # 180-degree rotational symmetry: cell i goes together with cell 80 - i.
+    return [(index,) if index == 40 else (index, 80 - index) for index in cells if index <= 40]
+
+
+def dig_holes(solution, rng=random, symmetric=False, target_clues=17, target_rating=None):
+    '''Blanks cells of a solved 9x9 grid in random order (in symmetric pairs
+    if asked), keeping each removal only if the solution stays unique.  Stops
+    once target_clues remain, once the rating reaches target_rating or when
+    no cell is left to try.  Returns the puzzle as a new 9x9 grid.
+
+    Each removal is checked incrementally: the puzzle was unique before, so a
+    second solution has to differ in a cell just blanked, and a search with
+    that cell's old value excluded finds it or proves there is none.
+    '''
+    puzzle = [row[:] for row in solution]
+    clues = 81
+    for group in _dig_order(rng, symmetric):
+        if clues - len(group) < target_clues:
+            continue
+
+        for index in group:
+            puzzle[index // 9][index % 9] = 0
+        if any(has_solution_excluding(puzzle, index, solution[index // 9][index % 9]) for index in group):
+            for index in group:
+                puzzle[index // 9][index % 9] = solution[index // 9][index % 9]
+            continue
+
+        clues -= len(group)
+        if clues <= target_clues:
+            break
+        if target_rating is not None and rate_puzzle(puzzle) >= target_rating:
+            break
+    return puzzle
+
+
+def generate_puzzle(level=None, target_clues=None, target_rating=None, symmetric=False, rng=None, seed=None):
+    '''Generates a puzzle with exactly one solution and returns a
+    GeneratedPuzzle.  level picks target_clues from LEVEL_CLUES; pass a
+    random.Random as rng, or a seed, for reproducible puzzles.'''
+    if rng is None:
+        rng = random.Random(seed)
+    if target_clues is None:
+        if level is None:
+            target_clues = 17
+        elif level in LEVEL_CLUES:
+            target_clues = LEVEL_CLUES[level]
+        else:
+            raise ValueError(f'Unknown level {level!r}.')
+
+    solution = solved_grid(rng)
+    puzzle = dig_holes(solution, rng, symmetric, target_clues, target_rating)
+    clues = sum(1 for row in puzzle for num in row if num)
+    return GeneratedPuzzle(puzzle, solution, clues, rate_puzzle(puzzle))
+
+
+def generate_puzzles(count, level=None, target_clues=None, target_rating=None, symmetric=False, seed=None):
+    '''Generates a batch of count unique puzzles from one seeded random
+    stream, so the same seed always gives the same batch.'''
+    rng = random.Random(seed)
+    return [
+        generate_puzzle(level, target_clues, target_rating, symmetric, rng)
+        for _ in range(count)
+    ]
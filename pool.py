@@ -0,0 +1,143 @@
+'''Per-level pools of ready-made puzzles, kept topped up by a background
+thread so the GUI can hand out a new board without generating it.
+
+    pool = PuzzlePool(depth=8, refill_at=3, path='pool.json')
+    pool.start()
+    puzzle = pool.pop('hard')
+    ...
+    pool.stop()
+
+The worker sleeps until some level drops to refill_at puzzles or fewer,
+then fills every level back up to depth.  With a path the pools are loaded
+from it on creation and written back by stop(), so a warm start has
+puzzles ready at once.
+'''
+import json
+import os
+import random
+import tempfile
+import threading
+from collections import deque
+
+from generator import generate_puzzle
+from solver import format_puzzle, parse_puzzle
+
+
+class PuzzlePool:
+
+    def __init__(self, levels=('easy', 'medium', 'hard'), depth=8, refill_at=3, path=None, seed=None):
+        if depth < 1 or not 0 <= refill_at < depth:
+            raise ValueError('Pool depth must be at least 1 and refill_at below it.')
+        self.levels = tuple(levels)
+        self.depth = depth
+        self.refill_at = refill_at
+        self.path = path
+        self.generated = 0
+        self.misses = 0
+
+        self._puzzles = {level: deque() for level in self.levels}
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._rng = random.Random(seed)
+
+        if path is not None:
+            self.load()
+
+    def start(self):
+        '''Starts the background worker; it fills every level to depth.'''
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='puzzle-pool', daemon=True)
+            self._thread.start()
+        self._wanted.set()
+
+    def stop(self):
+        '''Stops the worker after its current puzzle and saves the pools if
+        the pool has a path.'''
+        if self._thread is not None:
+            self._stopping = True
+            self._wanted.set()
+            self._thread.join()
+            self._thread = None
+        if self.path is not None:
+            self.save()
+
+    def pop(self, level):
+        '''Returns a 9x9 puzzle for level.  Taken from the pool when one is
+        ready; otherwise generated on the spot, which counts as a miss.'''
+        with self._lock:
+            puzzles = self._puzzles[level]
+            puzzle = puzzles.popleft() if puzzles else None
+            low = len(puzzles) <= self.refill_at
+        if low:
+            self._wanted.set()
+        if puzzle is None:
+            self.misses += 1
+            puzzle = generate_puzzle(level).puzzle
+        return puzzle
+
+    def sizes(self):
+        with self._lock:
+            return {level: len(puzzles) for level, puzzles in self._puzzles.items()}
+
+    def _next_level(self):
+        '''The emptiest level below depth, or None if every level is full.'''
+        with self._lock:
+            level = min(self.levels, key=lambda name: len(self._puzzles[name]))
+            return level if len(self._puzzles[level]) < self.depth else None
+
+    def _run(self):
+        while not self._stopping:
+            level = self._next_level()
+            if level is None:
+                self._wanted.clear()
+                # A pop may have drained a level between the check and clear().
+                if not self._below_refill():
+                    self._wanted.wait()
+                continue
+
+            puzzle = generate_puzzle(level, rng=self._rng).puzzle
+            with self._lock:
+                self._puzzles[level].append(puzzle)
+            self.generated += 1
+
+    def _below_refill(self):
+        with self._lock:
+            return any(len(puzzles) <= self.refill_at for puzzles in self._puzzles.values())
+
+    def load(self):
+        '''Adds the puzzles saved at path, up to depth per level.  A missing
+        or unreadable file leaves the pools as they are.'''
+        try:
+            with open(self.path) as source:
+                saved = json.load(source)
+            loaded = {
+                level: [parse_puzzle(line) for line in saved.get(level, ())]
+                for level in self.levels
+            }
+        except (OSError, ValueError, AttributeError, TypeError):
+            return
+        with self._lock:
+            for level, puzzles in loaded.items():
+                room = self.depth - len(self._puzzles[level])
+                self._puzzles[level].extend(puzzles[:max(room, 0)])
+
+    def save(self):
+        '''Writes the pools to path, replacing the file atomically.'''
+        with self._lock:
+            saved = {
+                level: [format_puzzle(puzzle) for puzzle in puzzles]
+                for level, puzzles in self._puzzles.items()
+            }
+        # A unique temporary file, so GUIs sharing one path never write to
+        # each other's copy.
+        handle, partial = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w') as output:
+                json.dump(saved, output)
+            os.replace(partial, self.path)
+        except BaseException:
+            os.unlink(partial)
+            raise
@@ -0,0 +1,68 @@
+'''Fonts and pre-rendered text surfaces for the pygame front end.
+
+Each font is loaded once, the first time its size is needed (pygame must be
+initialised by then), and every surface rendered here is kept, so drawing a
+frame's text comes down to blits.
+'''
+import pygame
+
+
+_fonts = {}
+_texts = {}
+_digits = {}
+_buttons = {}
+
+
+def font(size, bold=False):
+    key = size, bold
+    loaded = _fonts.get(key)
+    if loaded is None:
+        loaded = pygame.font.Font(None, size)
+        loaded.bold = bold
+        _fonts[key] = loaded
+    return loaded
+
+
+def text(string, size, color, bold=False):
+    '''Returns string rendered in the default font, rendering it only once.'''
+    key = string, size, tuple(color), bold
+    surface = _texts.get(key)
+    if surface is None:
+        surface = _texts[key] = font(size, bold).render(string, True, color)
+    return surface
+
+
+def digits(color, bold=False, size=38):
+    '''Returns a list of surfaces for the digits 1-9 in one style, indexed
+    by the digit (index 0 is None).'''
+    key = tuple(color), bold, size
+    surfaces = _digits.get(key)
+    if surfaces is None:
+        surfaces = _digits[key] = [None] + [
+            font(size, bold).render(str(num), True, color) for num in range(1, 10)
+        ]
+    return surfaces
+
+
+def button(label, width, height, border, color, border_color, text_color, size=26):
+    '''Returns a whole button, border and centred label included, as one
+    surface of width + 2 * border by height + 2 * border.'''
+    key = label, width, height, border, tuple(color), tuple(border_color), tuple(text_color), size
+    surface = _buttons.get(key)
+    if surface is None:
+        surface = pygame.Surface((width + border * 2, height + border * 2))
+        surface.fill(border_color)
+        face = pygame.Rect(border, border, width, height)
+        surface.fill(color, face)
+        label_surface = text(label, size, text_color)
+        surface.blit(label_surface, label_surface.get_rect(center=face.center))
+        _buttons[key] = surface
+    return surface
+
+
+def clear():
+    '''Drops every cached font and surface, e.g. after pygame.quit().'''
+    _fonts.clear()
+    _texts.clear()
+    _digits.clear()
+    _buttons.clear()
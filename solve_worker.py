@@ -0,0 +1,101 @@
+'''Runs a search in a background thread and streams its steps to the GUI.
+
+The search works on its own copy of the board.  Each on_step call pushes
+(event, cell index, board state) into a bounded StepQueue without ever
+blocking, so the search runs at close to headless speed.  When the GUI falls
+behind, the oldest steps are dropped, which loses nothing because every step
+carries the whole board: the GUI drains the queue once per frame, shows the
+newest board and highlights the newest step.
+'''
+import copy
+import threading
+import time
+from collections import deque
+
+
+class SolveCancelled(Exception):
+    '''Raised inside the worker's search to unwind it after cancel().'''
+
+
+class StepQueue:
+
+    def __init__(self, maxsize=256):
+        if maxsize < 1:
+            raise ValueError('StepQueue maxsize must be at least 1.')
+        self._steps = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self.pushed = 0
+        self.dropped = 0
+
+    def push(self, step):
+        with self._lock:
+            if len(self._steps) == self._steps.maxlen:
+                self.dropped += 1
+            self._steps.append(step)
+            self.pushed += 1
+
+    def drain(self):
+        '''Removes and returns every queued step, oldest first.'''
+        with self._lock:
+            steps = list(self._steps)
+            self._steps.clear()
+        return steps
+
+    def __len__(self):
+        return len(self._steps)
+
+
+class SolveWorker:
+    '''Runs search(board, on_step) on a copy of game in a daemon thread.
+
+    Once done is True, result holds the search's return value (None if it
+    was cancelled), error any exception it raised, state the final board as
+    bytes and elapsed the search time in seconds.
+    '''
+
+    def __init__(self, search, game, maxsize=256):
+        self.steps = StepQueue(maxsize)
+        self.result = None
+        self.error = None
+        self.state = None
+        self.elapsed = None
+        self.cancelled = False
+        self._search = search
+        self._board = copy.deepcopy(game)
+        self._thread = threading.Thread(target=self._run, name='solve-worker', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return self.state is not None
+
+    def cancel(self):
+        '''Stops the search at its next step and waits for the thread.'''
+        self.cancelled = True
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done
+
+    def _on_step(self, event, cell):
+        if self.cancelled:
+            raise SolveCancelled()
+        index = None if cell is None else cell.row * 9 + cell.col
+        self.steps.push((event, index, self._board.grid.state()))
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.result = self._search(self._board, self._on_step)
+        except SolveCancelled:
+            self.result = None
+        except Exception as error:
+            self.error = error
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self.state = self._board.grid.state()
@@ -1,15 +1,23 @@
+import atexit
+import os
 import pygame
 import sys
 import time
-import copy
-import random
-from collections import deque
-import heapq
-from solver import Sudoku
+from solver import (
+    Sudoku,
+    check_sudoku,
+    solve_astar,
+    solve_bfs,
+    solve_dfs,
+    solve_dls,
+    solve_greedy,
+    solve_ids,
+)
+from pool import PuzzlePool
+from solve_worker import SolveWorker
+import render_cache
 
 
-pygame.init()
-
 cell_size = 75
 minor_grid_size = 1
 major_grid_size = 3
@@ -38,11 +46,50 @@ l_pink = 255, 153, 204
 inactive_btn = d_purple    #142, 119, 84
 active_btn =  156, 0, 165  #165, 42, 42    #0, 0, 0 
 
+# Ready-made puzzles per level are kept here between runs; set
+# SUDOKU_POOL to another file, or to an empty string to keep them in memory.
+pool_path = os.environ.get('SUDOKU_POOL', os.path.join(os.path.expanduser('~'), '.sudoku-pool.json'))
+
+# Main loop pacing.  With nothing to do the loop sleeps in pygame.event.wait,
+# waking at least every idle_timeout ms; bursts of input (mouse motion,
+# typing) and running visual solves are drawn at no more than max_fps frames
+# a second.  Frames that take longer than frame_budget ms to handle and draw
+# are counted in frame_stats, which is printed at exit if SUDOKU_FRAME_STATS
+# is set.  play() reads max_fps from SUDOKU_FPS (see set_max_fps).
+max_fps = 60
+idle_timeout = 1000
+frame_budget = 1000 / max_fps
+frame_stats = {'frames': 0, 'over_budget': 0, 'worst_ms': 0.0, 'total_ms': 0.0}
+
+
+def set_max_fps(value):
+    '''Sets max_fps and frame_budget from value, e.g. SUDOKU_FPS; a value
+    that is not a whole number keeps the current rate, and rates below 1
+    are raised to 1.'''
+    global max_fps, frame_budget
+    try:
+        fps = int(value)
+    except (TypeError, ValueError):
+        print(f'Ignoring frame rate {value!r}; it must be a whole number.', file=sys.stderr)
+        return
+    max_fps = max(fps, 1)
+    frame_budget = 1000 / max_fps
+
+
+# The window is only opened by init_display(), so importing this module (or
+# the solvers through it) never starts a display.
+screen = None
+
+
+def init_display():
+    global screen
+    if screen is None:
+        pygame.init()
+        screen = pygame.display.set_mode(size)
+        pygame.display.set_caption('Sudoku')
+    return screen
 
 
-screen = pygame.display.set_mode(size)
-pygame.display.set_caption('Sudoku')
-
 class RectCell(pygame.Rect):
 
     def __init__(self, left, top, row, col):
@@ -80,13 +127,15 @@ def create_cells():
     return cells
 
 
-def draw_grid():
+def draw_grid(surface=None):
+    if surface is None:
+        surface = screen
     lines_drawn = 0
     pos = buffer + major_grid_size + cell_size
     while lines_drawn < 6:
-        pygame.draw.line(screen, l_pink, (pos, buffer),
+        pygame.draw.line(surface, l_pink, (pos, buffer),
                          (pos, width-buffer-1), minor_grid_size)
-        pygame.draw.line(screen, l_pink, (buffer, pos),
+        pygame.draw.line(surface, l_pink, (buffer, pos),
                          (width-buffer-1, pos), minor_grid_size)
 
         lines_drawn += 1
@@ -96,967 +145,314 @@ def draw_grid():
             pos += cell_size + major_grid_size
 
     for pos in range(buffer+major_grid_size//2, width, cell_size*3 + minor_grid_size*2 + major_grid_size):
-        pygame.draw.line(screen, l_pink, (pos, buffer),
+        pygame.draw.line(surface, l_pink, (pos, buffer),
                          (pos, width-buffer-1), major_grid_size)
-        pygame.draw.line(screen, l_pink, (buffer, pos),
+        pygame.draw.line(surface, l_pink, (buffer, pos),
                          (width-buffer-1, pos), major_grid_size)
 
 
-def fill_cells(cells, board):
-    font = pygame.font.Font(None, 38)
-
-    for row in range(9):
-        for col in range(9):
-            if board.board[row][col].value is None:
-                continue
-
-            if not board.board[row][col].editable:
-                font.bold = True
-                text = font.render(f'{board.board[row][col].value}', 1, d_pink)
-
-            else:
-                font.bold = False
-                if board.check_move(board.board[row][col], board.board[row][col].value):
-                    text = font.render(
-                        f'{board.board[row][col].value}', 1, green)
-                else:
-                    text = font.render(
-                        f'{board.board[row][col].value}', 1, red)
-
-            xpos, ypos = cells[row][col].center
-            textbox = text.get_rect(center=(xpos, ypos))
-            screen.blit(text, textbox)
+def cell_glyph(board, cell):
+    '''The cached surface for a cell's digit in its style, or None if the
+    cell is empty.'''
+    if cell.value is None:
+        return None
+    if not cell.editable:
+        return render_cache.digits(d_pink, bold=True)[cell.value]
+    if board.check_move(cell, cell.value):
+        return render_cache.digits(green)[cell.value]
+    return render_cache.digits(red)[cell.value]
 
 
 def draw_button(left, top, width, height, border, color, border_color, text):
-    pygame.draw.rect(
-        screen,
-        border_color,
-        (left, top, width+border*2, height+border*2),
-    )
-
-    button = pygame.Rect(
-        left+border,
-        top+border,
-        width,
-        height
-    )
-    pygame.draw.rect(screen, color, button)
-
-    font = pygame.font.Font(None, 26)
-    text = font.render(text, 1, white)
-    xpos, ypos = button.center
-    textbox = text.get_rect(center=(xpos, ypos))
-    screen.blit(text, textbox)
-
-    return button
-
-
-def draw_board(active_cell, cells, game):
-    draw_grid()
-    if active_cell is not None:
-        pygame.draw.rect(screen, gray, active_cell)
-
-    fill_cells(cells, game)
-
-
-def visual_solve(game, cells):
-    cell = game.get_empty_cell()
-
-    if not cell:
-        return True
-
-    for val in range(1, 10):
-        
+    screen.blit(render_cache.button(text, width, height, border, color, border_color, white), (left, top))
+    return pygame.Rect(left+border, top+border, width, height)
+
+
+# Highlight colour for the cell of a solver step; other steps (backtrack)
+# are not highlighted.
+step_colors = {
+    'try': red,
+    'reject': red,
+    'assign': green,
+    'expand': green,
+}
+
+
+def apply_step(game, cells, step):
+    '''Shows a SolveWorker step on game and returns its highlight as
+    (cell rect, colour), or None.'''
+    event, index, state = step
+    game.grid.load(state)
+    if index is None or event not in step_colors:
+        return None
+    return cells[index // 9][index % 9], step_colors[event]
+
+
+def watch_solve(search, game, cells):
+    '''Runs search in a SolveWorker and animates it at up to max_fps,
+    showing only the newest step each frame.  Returns the search's result
+    with game left in its final state.'''
+    worker = SolveWorker(search, game).start()
+    view = PlayView(cells)
+    clock = pygame.time.Clock()
+    highlight = None
+    while not worker.done:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                worker.cancel()
                 sys.exit()
+        steps = worker.steps.drain()
+        if steps:
+            highlight = apply_step(game, cells, steps[-1])
+        view.draw(game, None, {}, (-1, -1), highlight)
+        clock.tick(max_fps)
 
-        cell.value = val
-
-        screen.fill(white)
-        draw_board(None, cells, game)
-        cell_rect = cells[cell.row][cell.col]
-        pygame.draw.rect(screen, red, cell_rect, 5)
-        pygame.display.update([cell_rect])
-        #time.sleep(0.02)
-
-        if not game.check_move(cell, val):
-            cell.value = None
-            continue
+    game.grid.load(worker.state)
+    view.draw(game, None, {}, (-1, -1))
+    if worker.error is not None:
+        raise worker.error
+    return worker.result
 
-        screen.fill(white)
-        pygame.draw.rect(screen, green, cell_rect, 5)
-        draw_board(None, cells, game)
-        pygame.display.update([cell_rect])
 
-        if visual_solve(game, cells):
-            return True
-
-        cell.value = None
-
-
-    screen.fill(white)
-    pygame.draw.rect(screen, white, cell_rect, 5)
-    draw_board(None, cells, game)
-    pygame.display.update([cell_rect])
-    return False
+def visual_solve(game, cells):
+    return watch_solve(solve_dfs, game, cells)
 
 
 def bfs_solve(game, cells):
-
-    queue = deque()
-    visited = set()
-
-    def board_signature(board):
-        return tuple(tuple(cell.value for cell in row) for row in board)
-
-    initial_state = copy.deepcopy(game.board)
-    queue.append(initial_state)
-
-    while queue:
-        current_board = queue.popleft()
-        sig = board_signature(current_board)
-        if sig in visited:
-            continue
-        visited.add(sig)
-
-        for r in range(9):
-            for c in range(9):
-                game.board[r][c].value = current_board[r][c].value
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-
-        screen.fill(white)
-        draw_board(None, cells, game)
-        pygame.display.flip()
-        #time.sleep(0.02)
-          
-        cell = game.get_empty_cell()
-        if not cell:
-            return True
-
-        for val in range(1, 10):
-
-            cell.value = val
-
-            screen.fill(white)
-            draw_board(None, cells, game)
-            cell_rect = cells[cell.row][cell.col]
-            pygame.draw.rect(screen, red, cell_rect, 5)
-            pygame.display.update([cell_rect])
-
-
-            if not game.check_move(cell, val):
-                cell.value = None
-                continue
-
-            new_state = copy.deepcopy(current_board)
-            new_state[cell.row][cell.col].value = val
-            queue.append(new_state)
-            screen.fill(white)
-            pygame.draw.rect(screen, green, cell_rect, 5)
-            draw_board(None, cells, game)
-            pygame.display.update([cell_rect])
-
-    screen.fill(white)
-    pygame.draw.rect(screen, white, cell_rect, 5)
-    draw_board(None, cells, game)
-    pygame.display.update([cell_rect])    
-
-    return False
+    return watch_solve(solve_bfs, game, cells)
 
 
 def dls_solve(game, cells, limit, depth=0):
+    return watch_solve(lambda board, on_step: solve_dls(board, limit, depth, on_step), game, cells)
 
-    cell = game.get_empty_cell()
-    if not cell:
-        return True
-    
-    if depth > limit:
-        return False
-
-    for val in range(1, 10):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-  
-
-        if not game.check_move(cell, val):
-            continue
-
-        cell.value = val
-
-        screen.fill(white)
-        draw_board(None, cells, game)
-        cell_rect = cells[cell.row][cell.col]
-        pygame.draw.rect(screen, red, cell_rect, 5)
-        pygame.display.update([cell_rect])
-        #time.sleep(0.02)
-
-        if dls_solve(game, cells, limit, depth + 1):
-            return True
-
-        cell.value = None
-
-    screen.fill(white)
-    draw_board(None, cells, game)
-    pygame.display.update()
-    return False
-
-
-def ids_solve(game, cells):        
-    depth = 0
-    while True:
-        result = dls_solve(game, cells, depth)
-        if result:
-            return True
-        depth += 1
-
-
-from itertools import count
-def astar_solve(sudoku,cells):
-    
-    def heuristic(board):
-        #return sum(1 for row in board for cell in row if cell.value is None)
-        return sum(len(sudoku.get_possible_moves(cell)) for row in board for cell in row if cell.value is None)
-
-    def board_signature(board):
-        return tuple(tuple(cell.value for cell in row) for row in board)
-
-    pq = []
-    visited = set()
-    counter = count()
-    heapq.heappush(pq, (heuristic(sudoku.board), 0, next(counter), copy.deepcopy(sudoku.board)))
 
-    while pq:
-        f, g, _, current_board = heapq.heappop(pq)
+def ids_solve(game, cells):
+    return watch_solve(solve_ids, game, cells)
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
 
-        cell = sudoku.get_empty_cell()
-        if not cell:
-            return True
-
-        sig = board_signature(current_board)
-        if sig in visited:
-            continue
-        visited.add(sig)
-
-        for r in range(9):
-            for c in range(9):
-                sudoku.board[r][c].value = current_board[r][c].value
-
-        screen.fill(white)  
-        cell_rect = cells[cell.row][cell.col]
-        pygame.draw.rect(screen, green, cell_rect, 5)
-        draw_board(None, cells, sudoku)
-        pygame.display.update([cell_rect])
-        time.sleep(0.02) 
-
-        for row in range(9):
-            for col in range(9):
-                cell = current_board[row][col]
-
-                if cell.value is None:
-                    
-                    possible = sudoku.get_possible_moves(cell)
-                    for val in possible:
-                        new_board = copy.deepcopy(current_board)
-                        new_board[row][col].value = val
-                        h = heuristic(new_board)
-                        heapq.heappush(pq, (g + 1 + h, g + 1, next(counter), new_board))
-                    break
-            else:
-                continue
-            break
-    return False
+def astar_solve(sudoku, cells):
+    return watch_solve(solve_astar, sudoku, cells)
 
 
 def greedy_solve(sudoku, cells):
-    
-    def heuristic(board):
-        #return sum(1 for row in board for cell in row if cell.value is None)
-        return sum(len(sudoku.get_possible_moves(cell)) for row in board for cell in row if cell.value is None)
-
-
-    def board_signature(board):
-        return tuple(tuple(cell.value for cell in row) for row in board)
-
-    pq = []
-    visited = set()
-    counter = count()
-    heapq.heappush(pq, (heuristic(sudoku.board), next(counter), copy.deepcopy(sudoku.board)))
-
-    while pq:
-        f, _, current_board = heapq.heappop(pq)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-
-        cell = sudoku.get_empty_cell()
-        if not cell:
-            return True
-
-        sig = board_signature(current_board)
-        if sig in visited:
-            continue
-        visited.add(sig)
-
-        for r in range(9):
-            for c in range(9):
-                sudoku.board[r][c].value = current_board[r][c].value
-
-        screen.fill(white) 
-        cell_rect = cells[cell.row][cell.col]
-        pygame.draw.rect(screen, green, cell_rect, 5)
-        draw_board(None, cells, sudoku)
-        pygame.display.update([cell_rect])
-        time.sleep(0.02) 
-
-
-        for row in range(9):
-            for col in range(9):
-                cell = current_board[row][col]
-
-                if cell.value is None:
-                    
-                    possible = sudoku.get_possible_moves(cell)
-                    for val in possible:
-                        new_board = copy.deepcopy(current_board)
-                        new_board[row][col].value = val
-                        h = heuristic(new_board)
-                        heapq.heappush(pq, (h , next(counter), new_board))
-                    break
-            else:
-                continue
-            break
-    return False
-
-    
-def check_sudoku(sudoku):
-
-    if sudoku.get_empty_cell():
-        raise ValueError('Game is not complete')
-
-    row_sets = [set() for _ in range(9)]
-    col_sets = [set() for _ in range(9)]
-    box_sets = [set() for _ in range(9)]
+    return watch_solve(solve_greedy, sudoku, cells)
+
+
+# play()'s buttons as (name, label, left, top) of their outer border.
+button_left = width + 160 - button_border*2 - button_width
+button_bottom = height - button_height - button_border*2 - buffer
+buttons = (
+    ('reset', 'Reset', width + 160 - buffer - button_border*2 - button_width, button_bottom),
+    ('easy', 'Easy', width + 100 - buffer*3 - button_border*2 - button_width - 130, button_bottom),
+    ('medium', 'Medium', width - buffer*3 - button_border*2 - button_width - 265, button_bottom),
+    ('hard', 'Hard', width - 100 - buffer*3 - button_border*2 - button_width - 400, button_bottom),
+    ('dfs', 'DFS Solve', button_left, height - 650 - button_height - button_border*2 - buffer),
+    ('bfs', 'BFS Solve', button_left, height - 520 - button_height - button_border*2 - buffer),
+    ('ids', 'IDS Solve', button_left, height - 390 - button_height - button_border*2 - buffer),
+    ('greedy', 'Greedy Solve', button_left, height - 260 - button_height - button_border*2 - buffer),
+    ('astar', 'A* Solve', button_left, height - 130 - button_height - button_border*2 - buffer),
+)
+
+# Where each visual solver's last time is shown once the board is solved.
+time_positions = {
+    'dfs': (width + 50, height - 635),
+    'bfs': (width + 50, height - 505),
+    'ids': (width + 50, height - 375),
+    'greedy': (width + 50, height - 245),
+    'astar': (width + 50, height - 115),
+}
+
+
+def make_background():
+    '''Renders everything in play()'s window that never changes: the grid
+    lines, the title and the buttons in their idle state.'''
+    background = pygame.Surface(size)
+    background.fill(white)
+    draw_grid(background)
+    background.blit(render_cache.text('AI Algorithms', 30, d_purple), (width+15, height-770))
+    for _, label, left, top in buttons:
+        background.blit(
+            render_cache.button(label, button_width, button_height, button_border, inactive_btn, white, white),
+            (left, top),
+        )
+    return background
 
-    for row in range(9):
-        for col in range(9):
-            box = (row // 3) * 3 + col // 3
-            value = sudoku.board[row][col].value
 
-            if value in row_sets[row] or value in col_sets[col] or value in box_sets[box]:
-                return False
+class PlayView:
+    '''Draws play()'s window from a cached background.
 
-            row_sets[row].add(value)
-            col_sets[col].add(value)
-            box_sets[box].add(value)
+    Each frame only the cells whose digit, style or highlight changed and
+    the buttons whose hover state changed are redrawn, and only their
+    rectangles are passed to pygame.display.update.  highlight, if given,
+    is a (cell rect, colour) pair outlining a solver's current cell.
+    invalidate() forces a full redraw.
+    '''
 
-    return True
+    def __init__(self, cells):
+        self.cells = cells
+        self.background = make_background()
+        self.button_rects = {
+            name: pygame.Rect(left+button_border, top+button_border, button_width, button_height)
+            for name, _, left, top in buttons
+        }
+        self.invalidate()
+
+    def invalidate(self):
+        self._cell_keys = [[None] * 9 for _ in range(9)]
+        self._hovered = None
+        self._overlay = None
+        self._full = True
+
+    def draw(self, game, active_cell, times, mouse_pos, highlight=None):
+        solved = not game.get_empty_cell() and check_sudoku(game)
+        overlay = tuple(sorted(times.items())) if solved else None
+        if overlay != self._overlay:
+            self.invalidate()
+            self._overlay = overlay
+
+        full = self._full
+        self._full = False
+        if full:
+            screen.blit(self.background, (0, 0))
+        dirty = []
+
+        for row in self.cells:
+            for rect in row:
+                text = cell_glyph(game, game.board[rect.row][rect.col])
+                outline = highlight[1] if highlight is not None and highlight[0] is rect else None
+                key = text, rect is active_cell, outline
+                if key == self._cell_keys[rect.row][rect.col]:
+                    continue
+                self._cell_keys[rect.row][rect.col] = key
+
+                screen.blit(self.background, rect, rect)
+                if rect is active_cell:
+                    pygame.draw.rect(screen, gray, rect)
+                if text is not None:
+                    screen.blit(text, text.get_rect(center=rect.center))
+                if outline is not None:
+                    pygame.draw.rect(screen, outline, rect, 5)
+                dirty.append(rect)
+
+        hovered = None
+        for name, rect in self.button_rects.items():
+            if rect.collidepoint(mouse_pos):
+                hovered = name
+        if full or hovered != self._hovered:
+            for name, label, left, top in buttons:
+                if name == hovered:
+                    dirty.append(draw_button(left, top, button_width, button_height, button_border,
+                                             active_btn, black, label).inflate(button_border*2, button_border*2))
+                elif name == self._hovered and not full:
+                    area = self.button_rects[name].inflate(button_border*2, button_border*2)
+                    screen.blit(self.background, area, area)
+                    dirty.append(area)
+            self._hovered = hovered
+
+        if solved:
+            text = render_cache.text('Solved!', 50, green)
+            textbox = text.get_rect(center=(width // 2, (cell_size * 9) // 2 + buffer))
+            if full or textbox.collidelist(dirty) != -1:
+                screen.blit(text, textbox)
+                dirty.append(textbox)
+            if full:
+                for name, seconds in times.items():
+                    screen.blit(render_cache.text(f'{seconds:.3f} s', 24, black), time_positions[name])
+
+        if full:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+
+
+def record_frame(elapsed_ms):
+    frame_stats['frames'] += 1
+    frame_stats['total_ms'] += elapsed_ms
+    frame_stats['worst_ms'] = max(frame_stats['worst_ms'], elapsed_ms)
+    if elapsed_ms > frame_budget:
+        frame_stats['over_budget'] += 1
+
+
+def print_frame_stats():
+    frames = frame_stats['frames']
+    mean = frame_stats['total_ms'] / frames if frames else 0.0
+    print(
+        f"{frames} frames, mean {mean:.2f} ms, worst {frame_stats['worst_ms']:.2f} ms, "
+        f"{frame_stats['over_budget']} over the {frame_budget:.1f} ms budget",
+        file=sys.stderr,
+    )
 
 
 def play():
 
-    def is_valid(board, row, col, num):
-        for i in range(9):
-            if board[row][i] == num or board[i][col] == num:
-                return False
-        box_x = col // 3 * 3
-        box_y = row // 3 * 3
-        for i in range(3):
-            for j in range(3):
-                if board[box_y + i][box_x + j] == num:
-                    return False
-        return True
-    
-    def solve_board(board):
-        for row in range(9):
-            for col in range(9):
-                if board[row][col] == 0:
-                    nums = list(range(1, 10))
-                    random.shuffle(nums)
-                    for num in nums:
-                        if is_valid(board, row, col, num):
-                            board[row][col] = num
-                            if solve_board(board):
-                                return True
-                            board[row][col] = 0
-                    return False
-        return True    
-
-    def remove_by_percentage(board, percent):
-        total_cells = 81
-        to_remove = int((percent / 100.0) * total_cells)
-        removed = 0
-        while removed < to_remove:
-            row = random.randint(0, 8)
-            col = random.randint(0, 8)
-            if board[row][col] != 0:
-                board[row][col] = 0
-                removed += 1
-        return board
-    
-    def generate_board(level='easy'):
-        percent_map = {
-            'easy': 40,
-            'medium': 60,
-            'hard': 70
-        }
-        percent = percent_map.get(level, 40)
-        board = [[0 for _ in range(9)] for _ in range(9)]
-        solve_board(board)
-        puzzle = copy.deepcopy(board)
-        puzzle = remove_by_percentage(puzzle, percent)
-        return puzzle
-
-
-    puzzle = generate_board('easy')
+    init_display()
+    if 'SUDOKU_FPS' in os.environ:
+        set_max_fps(os.environ['SUDOKU_FPS'])
+    pool = PuzzlePool(path=pool_path or None)
+    pool.start()
+    atexit.register(pool.stop)
+    if os.environ.get('SUDOKU_FRAME_STATS'):
+        atexit.register(print_frame_stats)
+    puzzle = pool.pop('easy')
     game = Sudoku(puzzle)
     cells = create_cells()
+    view = PlayView(cells)
     active_cell = None
 
-    dfs_time = None
-    bfs_time = None
-    ids_time = None
-    astar_time = None
-    greedy_time = None
+    # A visual solve runs in a SolveWorker while the loop keeps handling
+    # input and drawing its newest step every frame.
+    solvers = {
+        'dfs': solve_dfs,
+        'bfs': solve_bfs,
+        'ids': solve_ids,
+        'astar': solve_astar,
+        'greedy': solve_greedy,
+    }
+    times = {}
+    worker = None
+    solving = None
+    before_solve = None
+    highlight = None
+    clock = pygame.time.Clock()
 
     while True:
-        for event in pygame.event.get():
+        if worker is None:
+            events = [pygame.event.wait(idle_timeout)]
+            events.extend(pygame.event.get())
+        else:
+            events = pygame.event.get()
+        frame_start = time.perf_counter()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 sys.exit()
 
 
             if event.type == pygame.MOUSEBUTTONUP:
                 mouse_pos = pygame.mouse.get_pos()
-
-                if l_easy.collidepoint(mouse_pos):
-                    puzzle = generate_board('easy')
-                    game = Sudoku(puzzle)
-
-                if l_medium.collidepoint(mouse_pos):
-                    puzzle = generate_board('medium')
-                    game = Sudoku(puzzle)
-
-                if l_hard.collidepoint(mouse_pos):
-                    puzzle = generate_board('hard')
+                clicked = None
+                for name, rect in view.button_rects.items():
+                    if rect.collidepoint(mouse_pos):
+                        clicked = name
+
+                # Any button stops a running solve and puts the board back.
+                if clicked is not None and worker is not None:
+                    worker.cancel()
+                    game.grid.load(before_solve)
+                    worker = None
+                    highlight = None
+
+                if clicked in ('easy', 'medium', 'hard'):
+                    puzzle = pool.pop(clicked)
                     game = Sudoku(puzzle)
 
-                if reset_btn.collidepoint(mouse_pos):
+                if clicked == 'reset':
                     game.reset()
 
-                if solve_btn.collidepoint(mouse_pos):
-                    screen.fill(white)
-                    active_cell = None
-                    draw_board(active_cell, cells, game)
-                    reset_btn = draw_button(
-                        width+160 - buffer - button_border*2 - button_width,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Reset'
-                    )
-                    l_easy = draw_button(
-                        width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Easy'
-                    )
-                    l_medium = draw_button(
-                        width - buffer*3 - button_border*2 - button_width - 265 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Medium'
-                    )
-                    l_hard = draw_button(
-                        width-100 - buffer*3 - button_border*2 - button_width - 400 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Hard'
-                    )
-                    solve_btn = draw_button(
-                        width+160  - button_border*2 - button_width,
-                        height-650 - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        black,
-                        'DFS Solve'
-                    )
-                    astar_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-130 - button_height - button_border*2 - buffer,
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "A* Solve"
-                    )
-                    greedy_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-260 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "Greedy Solve" 
-                    )
-                    bfs_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-520 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "BFS Solve"
-                    )
-                    ids_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-390 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "IDS Solve"
-                    )
-
-                    pygame.display.flip()
-                    start_time = time.time() 
-                    visual_solve(game, cells)
-                    dfs_time = time.time() - start_time
-
-                 
-                if bfs_btn.collidepoint(mouse_pos):
-                    screen.fill(white)
-                    active_cell = None
-                    draw_board(active_cell, cells, game)
-                    reset_btn = draw_button(
-                        width+160 - buffer - button_border*2 - button_width,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Reset'
-                    )
-                    l_easy = draw_button(
-                        width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Easy'
-                    )
-                    l_medium = draw_button(
-                        width - buffer*3 - button_border*2 - button_width - 265 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Medium'
-                    )
-                    l_hard = draw_button(
-                        width-100 - buffer*3 - button_border*2 - button_width - 400 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Hard'
-                    )
-                    solve_btn = draw_button(
-                        width+160  - button_border*2 - button_width,
-                        height-650 - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        black,
-                        'DFS Solve'
-                    )
-                    astar_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-130 - button_height - button_border*2 - buffer,
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "A* Solve"
-                    )
-                    greedy_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-260 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "Greedy Solve" 
-                    )
-                    bfs_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-520 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "BFS Solve"
-                    )
-                    ids_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-390 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "IDS Solve"
-                    )
-
-                    pygame.display.flip()
-                    start_time = time.time() 
-                    bfs_solve(game, cells)
-                    bfs_time = time.time() - start_time
-
-                 
-                if ids_btn.collidepoint(mouse_pos):
-                    screen.fill(white)
-                    active_cell = None
-                    draw_board(active_cell, cells, game)
-                    reset_btn = draw_button(
-                        width+160 - buffer - button_border*2 - button_width,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Reset'
-                    )
-                    l_easy = draw_button(
-                        width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Easy'
-                    )
-                    l_medium = draw_button(
-                        width - buffer*3 - button_border*2 - button_width - 265 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Medium'
-                    )
-                    l_hard = draw_button(
-                        width-100 - buffer*3 - button_border*2 - button_width - 400 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Hard'
-                    )
-                    solve_btn = draw_button(
-                        width+160  - button_border*2 - button_width,
-                        height-650 - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        black,
-                        'DFS Solve'
-                    )
-                    astar_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-130 - button_height - button_border*2 - buffer,
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "A* Solve"
-                    )
-                    greedy_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-260 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "Greedy Solve" 
-                    )
-                    bfs_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-520 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "BFS Solve"
-                    )
-                    ids_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-390 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "IDS Solve"
-                    )
-
-                    pygame.display.flip()
-                    start_time = time.time() 
-                    ids_solve(game, cells)
-                    #dls_solve(game, cells,limit=81)
-                    ids_time = time.time() - start_time
-                
-
-                if astar_btn.collidepoint(mouse_pos):
-                    screen.fill(white)
-                    active_cell = None
-                    draw_board(active_cell, cells, game)
-                    reset_btn = draw_button(
-                        width+160 - buffer - button_border*2 - button_width,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Reset'
-                    )
-                    l_easy = draw_button(
-                        width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Easy'
-                    )
-                    l_medium = draw_button(
-                        width - buffer*3 - button_border*2 - button_width - 265 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Medium'
-                    )
-                    l_hard = draw_button(
-                        width-100 - buffer*3 - button_border*2 - button_width - 400 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Hard'
-                    )
-                    solve_btn = draw_button(
-                        width+160  - button_border*2 - button_width,
-                        height-650 - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        black,
-                        'DFS Solve'
-                    )
-                    astar_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-130 - button_height - button_border*2 - buffer,
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "A* Solve"
-                    )
-                    greedy_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-260 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "Greedy Solve" 
-                    )
-                    bfs_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-520 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "BFS Solve"
-                    )
-                    ids_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-390 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "IDS Solve"
-                    )
-
-                    pygame.display.flip()
-                    start_time = time.time() 
-                    astar_solve(game, cells)
-                    astar_time = time.time() - start_time
-                
-
-                if greedy_btn.collidepoint(mouse_pos):
-                    screen.fill(white)
-                    active_cell = None
-                    draw_board(active_cell, cells, game)
-                    reset_btn = draw_button(
-                        width+160 - buffer - button_border*2 - button_width,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Reset'
-                    )
-                    l_easy = draw_button(
-                        width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Easy'
-                    )
-                    l_medium = draw_button(
-                        width - buffer*3 - button_border*2 - button_width - 265 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Medium'
-                    )
-                    l_hard = draw_button(
-                        width-100 - buffer*3 - button_border*2 - button_width - 400 ,
-                        height - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        white,
-                        'Hard'
-                    )
-                    solve_btn = draw_button(
-                        width+160  - button_border*2 - button_width,
-                        height-650 - button_height - button_border*2 - buffer,
-                        button_width,
-                        button_height,
-                        button_border,
-                        inactive_btn,
-                        black,
-                        'DFS Solve'
-                    )
-                    astar_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-130 - button_height - button_border*2 - buffer,
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "A* Solve"
-                    )
-                    greedy_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-260 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "Greedy Solve" 
-                    )
-                    bfs_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-520 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "BFS Solve"
-                    )
-                    ids_btn = draw_button(
-                        width +160- button_border*2 - button_width ,
-                        height-390 - button_height - button_border*2 - buffer, 
-                        button_width, 
-                        button_height, 
-                        button_border, 
-                        inactive_btn, 
-                        white, 
-                        "IDS Solve"
-                    )
-
-                    pygame.display.flip()
-                    start_time = time.time() 
-                    greedy_solve(game,cells)
-                    greedy_time = time.time() - start_time
+                if clicked in solvers:
+                    before_solve = game.grid.state()
+                    worker = SolveWorker(solvers[clicked], game).start()
+                    solving = clicked
 
                 # Test if point in any cell
                 active_cell = None
@@ -1069,6 +465,10 @@ def play():
                 if active_cell and not game.board[active_cell.row][active_cell.col].editable:
                     active_cell = None
 
+                # The board belongs to the solver until it finishes
+                if worker is not None:
+                    active_cell = None
+
             if event.type == pygame.KEYUP:
                 if active_cell is not None:
 
@@ -1095,236 +495,21 @@ def play():
                     if event.key == pygame.K_BACKSPACE or event.key == pygame.K_DELETE:
                         game.board[active_cell.row][active_cell.col].value = None
 
-        screen.fill(white)
-
-        draw_board(active_cell, cells, game)
-
-        font = pygame.font.Font(None, 30)
-        text = font.render('AI Algorithms', 1, d_purple)
-        screen.blit(text, ( width+15, height-770))
-
-        reset_btn = draw_button(
-            width+160 - buffer - button_border*2 - button_width,
-            height - button_height - button_border*2 - buffer,
-            button_width,
-            button_height,
-            button_border,
-            inactive_btn,
-            white,
-            'Reset'
-        )        
-        l_easy = draw_button(
-            width+100 - buffer*3 - button_border*2 - button_width - 130 ,
-            height - button_height - button_border*2 - buffer,
-            button_width,
-            button_height,
-            button_border,
-            inactive_btn,
-            white,
-            'Easy'
-        )
-        l_medium = draw_button(
-            width - buffer*3 - button_border*2 - button_width - 265,
-            height - button_height - button_border*2 - buffer,
-            button_width,
-            button_height,
-            button_border,
-            inactive_btn,
-            white,
-            'Medium'
-        )
-        l_hard = draw_button(
-            width -100- buffer*3 - button_border*2 - button_width - 400,
-            height - button_height - button_border*2 - buffer,
-            button_width,
-            button_height,
-            button_border,
-            inactive_btn,
-            white,
-            'Hard'
-        )
-        solve_btn = draw_button(
-            width +160 - button_border*2 - button_width ,
-            height-650 - button_height - button_border*2 - buffer,
-            button_width,
-            button_height,
-            button_border,
-            inactive_btn,
-            white,
-            'DFS Solve'
-        )
-        astar_btn = draw_button(
-            width +160- button_border*2 - button_width ,
-            height-130 - button_height - button_border*2 - buffer,
-            button_width, 
-            button_height, 
-            button_border, 
-            inactive_btn, 
-            white, 
-            "A* Solve"
-        )
-        greedy_btn = draw_button(
-            width +160- button_border*2 - button_width ,
-            height-260 - button_height - button_border*2 - buffer, 
-            button_width, 
-            button_height, 
-            button_border, 
-            inactive_btn, 
-            white, 
-            "Greedy Solve" 
-        )
-        bfs_btn = draw_button(
-            width +160- button_border*2 - button_width ,
-            height-520 - button_height - button_border*2 - buffer, 
-            button_width, 
-            button_height, 
-            button_border, 
-            inactive_btn, 
-            white, 
-            "BFS Solve"
-        )
-        ids_btn = draw_button(
-            width +160- button_border*2 - button_width ,
-            height-390 - button_height - button_border*2 - buffer, 
-            button_width, 
-            button_height, 
-            button_border, 
-            inactive_btn, 
-            white, 
-            "IDS Solve"
-        )
-
-        if reset_btn.collidepoint(pygame.mouse.get_pos()):
-            reset_btn = draw_button(
-                width+160 - buffer - button_border*2 - button_width,
-                height - button_height - button_border*2 - buffer,
-                button_width,
-                button_height,
-                button_border,
-                active_btn,
-                black,
-                'Reset'
-            )        
-        if l_easy.collidepoint(pygame.mouse.get_pos()):
-            l_easy = draw_button(
-                width+100 - buffer*3 - button_border*2 - button_width - 130,
-                height - button_height - button_border*2 - buffer,
-                button_width,
-                button_height,
-                button_border,
-                active_btn,
-                black,
-                'Easy'
-            )
-        if l_medium.collidepoint(pygame.mouse.get_pos()):
-            l_medium = draw_button(
-                width - buffer*3 - button_border*2 - button_width - 265,
-                height - button_height - button_border*2 - buffer,
-                button_width,
-                button_height,
-                button_border,
-                active_btn,
-                black,
-                'Medium'
-            )
-        if l_hard.collidepoint(pygame.mouse.get_pos()):
-            l_hard = draw_button(
-                width-100 - buffer*3 - button_border*2 - button_width - 400,
-                height - button_height - button_border*2 - buffer,
-                button_width,
-                button_height,
-                button_border,
-                active_btn,
-                black,
-                'Hard'
-            )
-        if solve_btn.collidepoint(pygame.mouse.get_pos()):
-            solve_btn = draw_button(
-                width+160  - button_border*2 - button_width ,
-                height-650 - button_height - button_border*2 - buffer,
-                button_width,
-                button_height,
-                button_border,
-                active_btn,
-                black,
-                'DFS Solve'
-            )
-        if astar_btn.collidepoint(pygame.mouse.get_pos()):
-            astar_btn = draw_button(
-                width +160- button_border*2 - button_width ,
-                height-130 - button_height - button_border*2 - buffer,
-                button_width, 
-                button_height, 
-                button_border, 
-                active_btn, 
-                black, 
-                "A* Solve"
-            )
-        if greedy_btn.collidepoint(pygame.mouse.get_pos()):
-                greedy_btn = draw_button(
-                width +160- button_border*2 - button_width ,
-                height-260 - button_height - button_border*2 - buffer, 
-                button_width, 
-                button_height, 
-                button_border, 
-                active_btn, 
-                black, 
-                "Greedy Solve" 
-            )
-        if bfs_btn.collidepoint(pygame.mouse.get_pos()):
-            bfs_btn = draw_button(
-                width +160- button_border*2 - button_width ,
-                height-520 - button_height - button_border*2 - buffer, 
-                button_width, 
-                button_height, 
-                button_border, 
-                active_btn, 
-                black, 
-                "BFS Solve"
-            )   
-        if ids_btn.collidepoint(pygame.mouse.get_pos()):
-            ids_btn = draw_button(
-                width +160- button_border*2 - button_width ,
-                height-390 - button_height - button_border*2 - buffer, 
-                button_width, 
-                button_height, 
-                button_border, 
-                active_btn, 
-                black, 
-                "IDS Solve"
-            )
-
-        mid_x = width // 2 
-        mid_y = (cell_size * 9) // 2 + buffer
-      
-        if not game.get_empty_cell():
-            if check_sudoku(game):
-                
-                font = pygame.font.Font(None, 50)
-                text = font.render('Solved!', 1, green)
-                textbox = text.get_rect(center=(mid_x,mid_y))
-                screen.blit(text, textbox)
-
-                font = pygame.font.Font(None, 24)
-                if dfs_time is not None:
-                    time_text = font.render(f'{dfs_time:.3f} s', True, black)
-                    screen.blit(time_text, ( width+50, height-635))
-                if bfs_time is not None:
-                    time_text = font.render(f'{bfs_time:.3f} s', True, black)
-                    screen.blit(time_text, ( width+50, height-505))
-                if ids_time is not None:
-                    time_text = font.render(f'{ids_time:.3f} s', True, black)
-                    screen.blit(time_text, ( width+50, height-375))
-                if astar_time is not None:
-                    time_text = font.render(f'{astar_time:.3f} s', True, black)
-                    screen.blit(time_text, ( width+50, height-115))
-                if greedy_time is not None:
-                    time_text = font.render(f'{greedy_time:.3f} s', True, black)
-                    screen.blit(time_text, ( width+50, height-245))
-                    
-        pygame.display.flip()
-
-    
+        if worker is not None:
+            steps = worker.steps.drain()
+            if steps:
+                highlight = apply_step(game, cells, steps[-1])
+            if worker.done:
+                game.grid.load(worker.state)
+                if worker.error is not None:
+                    raise worker.error
+                times[solving] = worker.elapsed
+                worker = None
+                highlight = None
+
+        view.draw(game, active_cell, times, pygame.mouse.get_pos(), highlight)
+        record_frame((time.perf_counter() - frame_start) * 1000)
+        clock.tick(max_fps)
 
 
 if __name__ == '__main__':
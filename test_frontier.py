@@ -0,0 +1,72 @@
+'''Checks SpillQueue against a plain deque.  Run with python -m unittest or
+pytest.'''
+import os
+import random
+import tempfile
+import unittest
+from collections import deque
+
+from frontier import SpillQueue
+
+
+def _state(number, size):
+    return number.to_bytes(size, 'little')
+
+
+class SpillQueueTest(unittest.TestCase):
+
+    def test_matches_deque(self):
+        # Small hot and segment sizes force every path: spilling, reading
+        # segments back through mmap and moving the write buffer to the head.
+        rng = random.Random(15)
+        for hot_limit, segment_states, size in ((1, 1, 4), (2, 3, 4), (5, 2, 8), (7, 16, 81)):
+            expected = deque()
+            number = 0
+            with SpillQueue(hot_limit, size, segment_states) as queue:
+                for _ in range(5000):
+                    if rng.random() < 0.55:
+                        for _ in range(rng.randint(1, 6)):
+                            state = _state(number, size)
+                            number += 1
+                            queue.append(state)
+                            expected.append(state)
+                    elif expected:
+                        self.assertEqual(queue.popleft(), expected.popleft())
+                    else:
+                        self.assertRaises(IndexError, queue.popleft)
+                    self.assertEqual(len(queue), len(expected))
+                    self.assertEqual(bool(queue), bool(expected))
+                self.assertGreater(queue.segments_written, 0)
+                while expected:
+                    self.assertEqual(queue.popleft(), expected.popleft())
+                self.assertFalse(queue)
+
+    def test_rejects_wrong_state_size(self):
+        with SpillQueue(2, 4) as queue:
+            self.assertRaises(ValueError, queue.append, b'abc')
+
+    def test_close_removes_own_directory(self):
+        queue = SpillQueue(hot_limit=2, state_size=4, segment_states=2)
+        for number in range(20):
+            queue.append(_state(number, 4))
+        queue.popleft()
+        queue.popleft()
+        queue.popleft()
+        self.assertTrue(os.listdir(queue.directory))
+        queue.close()
+        self.assertFalse(os.path.exists(queue.directory))
+        self.assertEqual(len(queue), 0)
+
+    def test_close_keeps_given_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with SpillQueue(hot_limit=1, state_size=4, segment_states=1, directory=directory) as queue:
+                for number in range(10):
+                    queue.append(_state(number, 4))
+                queue.popleft()
+                self.assertTrue(os.listdir(directory))
+            self.assertTrue(os.path.isdir(directory))
+            self.assertEqual(os.listdir(directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+'''Lockstep constraint propagation over many boards at once with NumPy.
+
+Boards are held as an (N, 81) uint8 array (0 is empty) and candidates as an
+(N, 81) uint16 array of 9-bit masks.  Every round eliminates, finds naked
+and hidden singles and places them for all still-active boards together;
+only boards that propagation cannot finish go to a scalar engine.
+'''
+import time
+
+import numpy as np
+
+from solver import (
+    ALL_DIGITS,
+    DIGIT_BITS,
+    ENGINES,
+    POPCOUNT,
+    UNITS,
+    UNITS_OF,
+    format_puzzle,
+    parse_puzzle,
+    puzzle_values,
+)
+
+
+_UNITS = np.array(UNITS, dtype=np.intp)
+_UNITS_OF = np.array(UNITS_OF, dtype=np.intp)
+_DIGIT_BITS = np.array(DIGIT_BITS, dtype=np.uint16)
+_POPCOUNT = np.array(POPCOUNT, dtype=np.uint8)
+_SHIFTS = np.arange(9, dtype=np.uint16)
+
+_BIT_DIGIT = np.zeros(512, dtype=np.uint8)
+for _num in range(1, 10):
+    _BIT_DIGIT[DIGIT_BITS[_num]] = _num
+
+
+def to_array(puzzles):
+    '''Packs puzzle lines, 9x9 grids or Sudokus into an (N, 81) uint8 array.'''
+    values = [
+        puzzle_values(parse_puzzle(puzzle) if isinstance(puzzle, str) else puzzle)
+        for puzzle in puzzles
+    ]
+    return np.array(values, dtype=np.uint8).reshape(-1, 81)
+
+
+def candidates(boards):
+    '''Returns the (N, 81) uint16 candidate masks and a per-board flag for
+    givens that clash within a row, column or box.'''
+    placed = _DIGIT_BITS[boards]
+    unit_used = np.bitwise_or.reduce(placed[:, _UNITS], axis=2)
+    filled = np.count_nonzero(boards[:, _UNITS], axis=2)
+    clash = (_POPCOUNT[unit_used] != filled).any(axis=1)
+
+    used = np.bitwise_or.reduce(unit_used[:, _UNITS_OF], axis=2)
+    cands = ~used & ALL_DIGITS
+    cands[boards != 0] = 0
+    return cands.astype(np.uint16), clash
+
+
+def propagate(boards):
+    '''Fills every naked and hidden single in all boards, in place.
+
+    Returns a status array: 1 for solved boards, -1 for contradictions and
+    0 for boards that need a search to finish.
+    '''
+    status = np.zeros(len(boards), dtype=np.int8)
+    active = np.arange(len(boards))
+
+    while len(active):
+        current = boards[active]
+        cands, clash = candidates(current)
+        empty = current == 0
+
+        # A digit that is neither placed nor possible in some unit is dead too.
+        covered = np.bitwise_or.reduce((cands | _DIGIT_BITS[current])[:, _UNITS], axis=2)
+        dead = clash | (empty & (cands == 0)).any(axis=1) | (covered != ALL_DIGITS).any(axis=1)
+        solved = ~dead & ~empty.any(axis=1)
+
+        naked = empty & (_POPCOUNT[cands] == 1)
+        values = np.where(naked, _BIT_DIGIT[cands], 0).astype(np.uint8)
+
+        # Hidden singles only for boards that had no naked single this round.
+        need_hidden = ~naked.any(axis=1) & ~dead & ~solved
+        if need_hidden.any():
+            planes = ((cands[need_hidden, :, None] >> _SHIFTS) & 1).astype(bool)
+            counts = planes[:, _UNITS, :].sum(axis=2)
+            only = (counts == 1)[:, _UNITS_OF, :].any(axis=2) & planes
+            several = only.sum(axis=2) > 1
+            hidden = np.where(only.any(axis=2), only.argmax(axis=2) + 1, 0)
+            values[need_hidden] = hidden.astype(np.uint8)
+            dead[np.flatnonzero(need_hidden)[several.any(axis=1)]] = True
+
+        stuck = ~dead & ~solved & ~values.any(axis=1)
+        status[active[dead]] = -1
+        status[active[solved]] = 1
+
+        moving = ~dead & ~solved & ~stuck
+        boards[active[moving]] = current[moving] + values[moving]
+        active = active[moving]
+
+    return status
+
+
+def solve_batch(puzzles, engine='propagate'):
+    '''Solves a batch of puzzles and returns a list of 9x9 solutions (None
+    where a puzzle has no solution).  Boards left unsolved by propagation are
+    finished by the scalar engine from solver.ENGINES.'''
+    boards = to_array(puzzles)
+    status = propagate(boards)
+    solve = ENGINES[engine]
+
+    solutions = []
+    for board, state in zip(boards, status):
+        rows = board.reshape(9, 9).tolist()
+        if state == 1:
+            solutions.append(rows)
+        elif state == 0:
+            solutions.append(solve(rows))
+        else:
+            solutions.append(None)
+    return solutions
+
+
+def solve_many_vectorized(puzzles, engine='propagate', chunk_size=4096):
+    '''Streaming counterpart of batch.solve_many: reads chunk_size puzzles
+    at a time and yields batch.SolveResult objects in input order.  elapsed
+    is the chunk's time shared evenly across its puzzles.'''
+    from batch import SolveResult
+
+    def flush(chunk):
+        start = time.perf_counter()
+        solutions = iter(solve_batch([rows for _, _, rows in chunk if rows is not None], engine))
+        elapsed = (time.perf_counter() - start) / len(chunk)
+        for index, line, rows in chunk:
+            if rows is None:
+                yield SolveResult(index, line, None, 'invalid', 0.0, {})
+                continue
+            solution = next(solutions)
+            yield SolveResult(
+                index,
+                format_puzzle(rows),
+                format_puzzle(solution) if solution is not None else None,
+                'solved' if solution is not None else 'unsolvable',
+                elapsed,
+                {},
+            )
+
+    chunk = []
+    for index, puzzle in enumerate(puzzles):
+        line = None
+        if isinstance(puzzle, str):
+            line = puzzle.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                puzzle = parse_puzzle(line)
+            except ValueError:
+                puzzle = None
+        chunk.append((index, line, puzzle))
+        if len(chunk) == chunk_size:
+            yield from flush(chunk)
+            chunk = []
+    if chunk:
+        yield from flush(chunk)